@@ -1,14 +1,18 @@
 import argparse
 import ipaddress
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from sys import stderr
 
 import boto3
 from pkg_resources import get_distribution, DistributionNotFound
 
 try:
-    from pyvpc_cidr_block import PyVPCBlock, return_pyvpc_objects_string, return_pyvpc_objects_json
+    from pyvpc_cidr_block import PyVPCBlock, return_pyvpc_objects_json, iter_pyvpc_objects_table, \
+        return_vpcs_utilisation_string, return_vpcs_utilisation_json, PYVPC_TABLE_COLUMN_NAMES
 except ModuleNotFoundError:
-    from .pyvpc_cidr_block import PyVPCBlock, return_pyvpc_objects_string, return_pyvpc_objects_json
+    from .pyvpc_cidr_block import PyVPCBlock, return_pyvpc_objects_json, iter_pyvpc_objects_table, \
+        return_vpcs_utilisation_string, return_vpcs_utilisation_json, PYVPC_TABLE_COLUMN_NAMES
 
 
 def get_aws_resource_name(resource):
@@ -33,62 +37,132 @@ def get_aws_regions_list():
     return regions_list
 
 
-def get_aws_vpc_if_exists(vpc_id_name, aws_region=None):
+def describe_aws_vpcs_by_filter(client, filter_name, value):
     """
-    Return reserved subnets, in input vpc
-
-    if first response successful, using vpc-id filter return the vpc-id found,
-    if vpc not found by its id, make second call using name filter,
-    return error if more then one vpc has same name
-
-    :param vpc_id_name: string
-    :param aws_region: string
-    :return: PyVPCBlock object
+    Return 'Vpcs' list of a single describe_vpcs call filtered by 'filter_name' == 'value'
+    :param client: boto3 ec2 client
+    :param filter_name: string
+    :param value: string
+    :return: list of dicts
     """
-    response = boto3.client('ec2', region_name=aws_region).describe_vpcs(
+    return client.describe_vpcs(
         Filters=[
             {
-                'Name': 'vpc-id',
+                'Name': filter_name,
                 'Values': [
-                    vpc_id_name,
+                    value,
                 ]
             },
         ],
     )['Vpcs']
 
-    if response:
-        vpc_cidr = ipaddress.ip_network(response[0]['CidrBlock'])
-        vpc_id = response[0]['VpcId']
-        vpc_name = get_aws_resource_name(response[0])
-        return PyVPCBlock(network=vpc_cidr, resource_id=vpc_id, name=vpc_name, resource_type='vpc')
 
-    # In case no VPC found using vpc-id filter, try using input as name filter
-    response = boto3.client('ec2', region_name=aws_region).describe_vpcs(
+def describe_aws_subnets_of_vpc(client, vpc_id):
+    """
+    Return 'Subnets' list of a single describe_subnets call filtered by vpc-id
+    :param client: boto3 ec2 client
+    :param vpc_id: string
+    :return: list of dicts
+    """
+    return client.describe_subnets(
         Filters=[
             {
-                'Name': 'tag:Name',
+                'Name': 'vpc-id',
                 'Values': [
-                    vpc_id_name,
+                    vpc_id,
                 ]
-            },
-        ],
-    )['Vpcs']
+            }
+        ])['Subnets']
+
+
+def aws_subnets_to_pyvpc_blocks(subnets):
+    """
+    Convert describe_subnets response items to PyVPCBlock objects
+    :param subnets: list of dicts
+    :return: list of PyVPCBlock objects
+    """
+    reserved_subnets = []
+    for subnet in subnets:
+        reserved_subnets.append(PyVPCBlock(network=ipaddress.ip_network(subnet['CidrBlock']),
+                                           resource_id=subnet['SubnetId'],
+                                           name=get_aws_resource_name(subnet),
+                                           resource_type='subnet'))
+    return reserved_subnets
+
 
-    # There is a single vpc with 'vpc_id_name'
-    if len(response) == 1:
-        vpc_cidr = ipaddress.ip_network(response[0]['CidrBlock'])
-        vpc_id = response[0]['VpcId']
-        vpc_name = get_aws_resource_name(response[0])
-        return PyVPCBlock(network=vpc_cidr, resource_id=vpc_id, name=vpc_name, resource_type='vpc')
+def resolve_aws_vpc(vpc_id_name, vpcs_by_id, vpcs_by_name):
+    """
+    Pick the vpc matching 'vpc_id_name' from the vpc-id and tag:Name describe_vpcs responses,
+    a match by id wins, return error if more then one vpc has same name
+
+    :param vpc_id_name: string
+    :param vpcs_by_id: list of dicts
+    :param vpcs_by_name: list of dicts
+    :return: PyVPCBlock object or None
+    """
+    if vpcs_by_id:
+        response = vpcs_by_id
     # Is case there are multiple VPCs with the same name, raise exception
-    elif len(response) > 1:
+    elif len(vpcs_by_name) > 1:
         found = []
-        for x in response:
+        for x in vpcs_by_name:
             found.append(x['VpcId'])
         raise ValueError("more then one vpc found with name {} - {}".format(vpc_id_name, str(found)))
+    elif vpcs_by_name:
+        response = vpcs_by_name
+    else:  # Nothing found
+        return None
 
-    # Nothing found
-    return None
+    vpc_cidr = ipaddress.ip_network(response[0]['CidrBlock'])
+    vpc_id = response[0]['VpcId']
+    vpc_name = get_aws_resource_name(response[0])
+    return PyVPCBlock(network=vpc_cidr, resource_id=vpc_id, name=vpc_name, resource_type='vpc')
+
+
+def get_aws_vpc_if_exists(vpc_id_name, aws_region=None):
+    """
+    Return vpc matching input id or name
+
+    Both the vpc-id and tag:Name filtered describe_vpcs calls are sent at the same time,
+    so the lookup costs a single round trip,
+    return error if more then one vpc has same name
+
+    :param vpc_id_name: string
+    :param aws_region: string
+    :return: PyVPCBlock object
+    """
+    return get_aws_vpc_and_subnets(vpc_id_name, aws_region, with_subnets=False)[0]
+
+
+def get_aws_vpc_and_subnets(vpc_id_name, aws_region=None, with_subnets=True):
+    """
+    Return vpc matching input id or name, and the reserved subnets inside it
+
+    The vpc-id lookup, the tag:Name lookup and (speculatively, assuming input is a vpc id)
+    the subnets fetch are all sent concurrently,
+    so when input is a vpc id everything resolves in a single round trip,
+    and when input is a name only one more describe_subnets call is made
+
+    :param vpc_id_name: string
+    :param aws_region: string
+    :param with_subnets: boolean, if False only the vpc is looked up
+    :return: tuple of (PyVPCBlock object or None, list of PyVPCBlock objects)
+    """
+    client = boto3.client('ec2', region_name=aws_region)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        by_id = executor.submit(describe_aws_vpcs_by_filter, client, 'vpc-id', vpc_id_name)
+        by_name = executor.submit(describe_aws_vpcs_by_filter, client, 'tag:Name', vpc_id_name)
+        subnets = executor.submit(describe_aws_subnets_of_vpc, client, vpc_id_name) if with_subnets else None
+
+        vpc = resolve_aws_vpc(vpc_id_name, by_id.result(), by_name.result())
+        if vpc is None or not with_subnets:
+            return vpc, []
+
+        # Input was a name, so the speculative subnets fetch used a wrong vpc-id
+        if vpc.get_id() != vpc_id_name:
+            return vpc, aws_subnets_to_pyvpc_blocks(describe_aws_subnets_of_vpc(client, vpc.get_id()))
+        return vpc, aws_subnets_to_pyvpc_blocks(subnets.result())
 
 
 def get_aws_reserved_subnets(vpc_id, aws_region=None):
@@ -98,23 +172,8 @@ def get_aws_reserved_subnets(vpc_id, aws_region=None):
     :param aws_region: string
     :return: list of PyVPCBlock objects
     """
-    response = boto3.client('ec2', region_name=aws_region).describe_subnets(
-        Filters=[
-            {
-                'Name': 'vpc-id',
-                'Values': [
-                    vpc_id,
-                ]
-            }
-        ])['Subnets']
-
-    reserved_subnets = []
-    for subnet in response:
-        reserved_subnets.append(PyVPCBlock(network=ipaddress.ip_network(subnet['CidrBlock']),
-                                           resource_id=subnet['SubnetId'],
-                                           name=get_aws_resource_name(subnet),
-                                           resource_type='subnet'))
-    return reserved_subnets
+    client = boto3.client('ec2', region_name=aws_region)
+    return aws_subnets_to_pyvpc_blocks(describe_aws_subnets_of_vpc(client, vpc_id))
 
 
 def get_aws_reserved_networks(region=None, all_regions=False):
@@ -143,6 +202,43 @@ def get_aws_reserved_networks(region=None, all_regions=False):
     return vpc_used_cidr_list
 
 
+def get_aws_vpcs_and_subnets(region=None, all_regions=False):
+    """
+    Get all vpc(s) and all subnets of input region (or of all regions if all_regions is True),
+    each resource type is fetched in a single paginated pass, and subnets are grouped by their vpc id,
+    vpc(s) with secondary cidr blocks are returned once per associated cidr block
+    :param region: string
+    :param all_regions: boolean
+    :return: tuple of (list of PyVPCBlock objects, dict of vpc id -> list of PyVPCBlock objects)
+    """
+    regions = get_aws_regions_list() if all_regions else [region]
+
+    vpcs = []
+    subnets_by_vpc = {}
+    for aws_region in regions:
+        client = boto3.client('ec2', region_name=aws_region)
+
+        for page in client.get_paginator('describe_vpcs').paginate():
+            for vpc in page['Vpcs']:
+                # A vpc may have secondary cidr blocks associated, return a PyVPCBlock for each of them
+                cidr_blocks = [x['CidrBlock'] for x in vpc.get('CidrBlockAssociationSet', [])
+                               if x['CidrBlockState']['State'] == 'associated'] or [vpc['CidrBlock']]
+                for cidr_block in cidr_blocks:
+                    vpcs.append(PyVPCBlock(network=ipaddress.ip_network(cidr_block),
+                                           resource_id=vpc['VpcId'],
+                                           name=get_aws_resource_name(vpc),
+                                           resource_type='vpc'))
+
+        for page in client.get_paginator('describe_subnets').paginate():
+            for subnet in page['Subnets']:
+                subnets_by_vpc.setdefault(subnet['VpcId'], []).append(
+                    PyVPCBlock(network=ipaddress.ip_network(subnet['CidrBlock']),
+                               resource_id=subnet['SubnetId'],
+                               name=get_aws_resource_name(subnet),
+                               resource_type='subnet'))
+    return vpcs, subnets_by_vpc
+
+
 def calculate_overlap_ranges(network, reserved_network):
     """
     Function will calculate all available ranges of over lapping network,  all possible scenarios demonstrates below.
@@ -252,15 +348,28 @@ def get_available_networks(desired_cidr, reserved_networks):
     if not overlapping_networks:
         return [PyVPCBlock(network=desired_cidr, block_available=True)]
 
-    # Sort PyVPCBlock objects (overlapping networks) by the 'network' field, so it will be easier to calculate
-    overlapping_networks = sorted(overlapping_networks, key=lambda x: x.network, reverse=False)
+    # Sort PyVPCBlock objects (overlapping networks) by the 'network' field, so it will be easier to calculate,
+    # identical networks are ordered by id and name, so the result does not depend on input order
+    overlapping_networks = sorted(overlapping_networks, key=get_reserved_network_key)
 
+    # Mark the start and end of calculation at the HEAD and TAIL (view details above) points
+    return calculate_available_blocks(desired_cidr[0], desired_cidr[-1], overlapping_networks)
+
+
+def calculate_available_blocks(range_head, range_tail, overlapping_networks):
+    """
+    Sweep sorted overlapping networks between range_head and range_tail addresses,
+    view get_available_networks documentation for details
+
+    :param range_head: IPv4Address
+    :param range_tail: IPv4Address
+    :param overlapping_networks: list of PyVPCBlock objects, sorted by network
+    :return: list of PyVPCBlock objects
+    """
     networks_result = []
-    range_head = desired_cidr[0]  # Mark the start of calculation at the HEAD (view details above) point
-    range_tail = desired_cidr[-1]  # Mark the end of calculation at the TAIL (view details above) point
 
     # Iterate over the overlapping networks
-    for reserved_net in overlapping_networks:
+    for index, reserved_net in enumerate(overlapping_networks):
         # If the lower boundary of current range_head is smaller than the lower boundary of reserved_net
         # It means the 'reserved_net' network is necessarily from 'the right' of range_head, and its available
         if range_head < reserved_net.get_start_address():
@@ -281,18 +390,361 @@ def get_available_networks(desired_cidr, reserved_networks):
             # head should always point to the next lower available address
             # so only if current head is "from the left" of most upper overlapping network, set it as new head,
             # As there might be a case of an inner network, see reserved_net (2) for details
-            if range_head < reserved_net.get_end_address():
+            if range_head <= reserved_net.get_end_address():
                 # Set the new range_head value, to one ip address above the upper boundary of reserved_net
                 range_head = reserved_net.get_end_address() + 1
 
         # If last iteration (here are no more overlapping networks, until the 'range_tail' address)
-        if overlapping_networks.index(reserved_net) == len(overlapping_networks) - 1:
+        if index == len(overlapping_networks) - 1:
             networks_result.append(PyVPCBlock(start_address=range_head,
                                               end_address=range_tail,
-                                              block_available=True))
+                                              block_available=True,
+                                              resource_type='available block'))
+    return networks_result
+
+
+def calculate_window_available_blocks(window_head, window_tail, range_tail, window_networks):
+    """
+    Sweep a window (part) of a desired cidr, the sweep runs up to range_tail (the desired cidr tail)
+    as a full calculation would, then the last available block is cut at window_tail
+
+    :param window_head: IPv4Address, first address not covered by networks before the window
+    :param window_tail: IPv4Address, last address of window
+    :param range_tail: IPv4Address, last address of desired cidr
+    :param window_networks: list of PyVPCBlock objects, sorted by network
+    :return: list of PyVPCBlock objects
+    """
+    if not window_networks:
+        if window_head <= window_tail:
+            return [PyVPCBlock(start_address=window_head, end_address=window_tail, block_available=True,
+                               resource_type='available block')]
+        return []
+
+    networks_result = calculate_available_blocks(window_head, range_tail, window_networks)
+    if networks_result[-1].block_available and networks_result[-1].get_end_address() > window_tail:
+        tail_block = networks_result.pop()
+        if tail_block.get_start_address() <= window_tail:
+            networks_result.append(PyVPCBlock(start_address=tail_block.get_start_address(), end_address=window_tail,
+                                              block_available=True, resource_type='available block'))
     return networks_result
 
 
+def get_reserved_network_key(reserved_net):
+    """
+    Sort key used to merge reserved network inventories,
+    networks sorted by this key are in the same order get_available_networks sorts them (start address,
+    then larger network first), and identical networks are ordered by id and name
+    :param reserved_net: PyVPCBlock object
+    :return: tuple
+    """
+    return (reserved_net.get_start_address().version, int(reserved_net.get_start_address()),
+            -int(reserved_net.get_end_address()), reserved_net.get_id() or '', reserved_net.get_name() or '')
+
+
+class PyVPCReservedIndex(object):
+    """
+    Reserved networks sorted once (per ip version) by get_reserved_network_key, with cached keys,
+    start addresses and running max end addresses, so inventories are compared without re-sorting,
+    and overlapping networks of any range are found with binary searches
+    """
+    def __init__(self, reserved_networks):
+        self.networks = {}
+        self.keys = {}
+        self.starts = {}
+        self.max_ends = {}
+
+        for key, reserved_net in sorted(((get_reserved_network_key(x), x) for x in reserved_networks),
+                                        key=lambda x: x[0]):
+            self.networks.setdefault(key[0], []).append(reserved_net)
+            self.keys.setdefault(key[0], []).append(key)
+
+        for version, keys in self.keys.items():
+            self.starts[version] = [key[1] for key in keys]
+            # Largest end address of this and all previous networks, used to skip networks that end too early
+            max_ends = []
+            max_end = -1
+            for key in keys:
+                max_end = max(max_end, -key[2])
+                max_ends.append(max_end)
+            self.max_ends[version] = max_ends
+
+    def apply(self, added=(), removed=()):
+        """
+        Update the index in place with a change set (as returned by diff_reserved_networks),
+        each change costs a binary search and a list insert/delete,
+        so an index kept across refreshes never needs to be sorted again
+        :param added: list of PyVPCBlock objects
+        :param removed: list of PyVPCBlock objects, must be in the index
+        :return: PyVPCReservedIndex object (self)
+        """
+        for reserved_net in removed:
+            key = get_reserved_network_key(reserved_net)
+            keys = self.keys.get(key[0], [])
+            position = bisect_left(keys, key)
+            if position == len(keys) or keys[position] != key:
+                raise ValueError('{} is not in reserved networks index'.format(reserved_net.get_network()))
+            for values in [keys, self.networks[key[0]], self.starts[key[0]], self.max_ends[key[0]]]:
+                del values[position]
+            self.update_max_ends(key[0], position)
+
+        for reserved_net in added:
+            key = get_reserved_network_key(reserved_net)
+            keys = self.keys.setdefault(key[0], [])
+            position = bisect_right(keys, key)
+            keys.insert(position, key)
+            self.networks.setdefault(key[0], []).insert(position, reserved_net)
+            self.starts.setdefault(key[0], []).insert(position, key[1])
+            self.max_ends.setdefault(key[0], []).insert(position, None)
+            self.update_max_ends(key[0], position)
+        return self
+
+    def update_max_ends(self, version, position):
+        """
+        Recalculate running max end addresses from position on, after a network was inserted or deleted there,
+        stops as soon as a value is unchanged (all following values are unchanged as well)
+        :param version: int, ip version
+        :param position: int
+        """
+        keys = self.keys[version]
+        max_ends = self.max_ends[version]
+        max_end = max_ends[position - 1] if position else -1
+        for index in range(position, len(keys)):
+            max_end = max(max_end, -keys[index][2])
+            if max_ends[index] == max_end:
+                break
+            max_ends[index] = max_end
+
+    def get_overlapping_range(self, version, lower, upper):
+        """
+        Return reserved networks overlapping lower - upper addresses, in index order
+        :param version: int, ip version
+        :param lower: int
+        :param upper: int
+        :return: list of PyVPCBlock objects
+        """
+        if version not in self.networks:
+            return []
+        first = bisect_left(self.max_ends[version], lower)
+        last = bisect_right(self.starts[version], upper)
+        keys = self.keys[version]
+        networks = self.networks[version]
+        return [networks[index] for index in range(first, last) if -keys[index][2] >= lower]
+
+    def get_overlapping(self, network):
+        """
+        Return reserved networks overlapping input network, sorted by network
+        :param network: IPv4Network or IPv6Network
+        :return: list of PyVPCBlock objects
+        """
+        return self.get_overlapping_range(network.version, int(network.network_address),
+                                          int(network.broadcast_address))
+
+    def simulate(self):
+        """
+        Start a what-if simulation on top of this index
+        :return: PyVPCSimulation object
+        """
+        try:
+            from pyvpc_simulation import PyVPCSimulation
+        except ModuleNotFoundError:
+            from .pyvpc_simulation import PyVPCSimulation
+        return PyVPCSimulation(self)
+
+
+def get_reserved_index(reserved_networks):
+    """
+    Return input as PyVPCReservedIndex, building one if a list of PyVPCBlock objects passed
+    :param reserved_networks: PyVPCReservedIndex object or list of PyVPCBlock objects
+    :return: PyVPCReservedIndex object
+    """
+    if isinstance(reserved_networks, PyVPCReservedIndex):
+        return reserved_networks
+    return PyVPCReservedIndex(reserved_networks)
+
+
+def diff_reserved_networks(old_reserved_networks, new_reserved_networks):
+    """
+    Compare two reserved networks inventories using a sorted merge over the cached index keys,
+    pass PyVPCReservedIndex objects (kept between refreshes) to avoid sorting the inventories on every call
+
+    :param old_reserved_networks: PyVPCReservedIndex object or list of PyVPCBlock objects
+    :param new_reserved_networks: PyVPCReservedIndex object or list of PyVPCBlock objects
+    :return: tuple of (added list of PyVPCBlock objects, removed list of PyVPCBlock objects)
+    """
+    old_index = get_reserved_index(old_reserved_networks)
+    new_index = get_reserved_index(new_reserved_networks)
+
+    added = []
+    removed = []
+    for version in sorted(set(old_index.keys) | set(new_index.keys)):
+        old_keys = old_index.keys.get(version, [])
+        new_keys = new_index.keys.get(version, [])
+        if old_keys == new_keys:
+            continue
+        old_networks = old_index.networks.get(version, [])
+        new_networks = new_index.networks.get(version, [])
+
+        old_position = 0
+        new_position = 0
+        while old_position < len(old_keys) and new_position < len(new_keys):
+            old_key = old_keys[old_position]
+            new_key = new_keys[new_position]
+            if old_key == new_key:
+                old_position += 1
+                new_position += 1
+            elif old_key < new_key:
+                removed.append(old_networks[old_position])
+                old_position += 1
+            else:
+                added.append(new_networks[new_position])
+                new_position += 1
+        removed.extend(old_networks[old_position:])
+        added.extend(new_networks[new_position:])
+    return added, removed
+
+
+class PyVPCBlockStartAddresses(object):
+    """
+    Read only sequence of start addresses of PyVPCBlock list, so bisect can search it without copying
+    """
+    def __init__(self, pyvpc_objects):
+        self.pyvpc_objects = pyvpc_objects
+
+    def __len__(self):
+        return len(self.pyvpc_objects)
+
+    def __getitem__(self, index):
+        return self.pyvpc_objects[index].get_start_address()
+
+
+def find_update_window(desired_cidr, previous_result, changed_lower, changed_upper):
+    """
+    Find the segment of previous_result that has to be recalculated for changes between
+    changed_lower and changed_upper addresses, it starts at the last available block before changed_lower,
+    and ends at the first available block after changed_upper (or at the desired_cidr boundaries)
+
+    :param desired_cidr: IPv4Network
+    :param previous_result: list of PyVPCBlock objects, as returned by get_available_networks
+    :param changed_lower: IPv4Address
+    :param changed_upper: IPv4Address
+    :return: tuple of (first index, last index, window head address, window tail address)
+    """
+    starts = PyVPCBlockStartAddresses(previous_result)
+
+    # Last block starting at/before changed_lower, then walk back to the available block before it
+    first_index = bisect_right(starts, changed_lower) - 1
+    while first_index > 0 and not previous_result[first_index].block_available:
+        first_index -= 1
+    first_index = max(first_index, 0)
+    window_head = previous_result[first_index].get_start_address() if first_index else desired_cidr[0]
+
+    # Last block starting at/before changed_upper, then walk forward to the available block after it
+    last_index = max(bisect_right(starts, changed_upper) - 1, first_index)
+    while last_index < len(previous_result) - 1 and not (previous_result[last_index].block_available and
+                                                         previous_result[last_index].get_end_address() >=
+                                                         changed_upper):
+        last_index += 1
+    window_tail = previous_result[last_index].get_end_address() \
+        if last_index < len(previous_result) - 1 else desired_cidr[-1]
+    return first_index, last_index, window_head, window_tail
+
+
+def find_update_windows(desired_cidr, previous_result, changed):
+    """
+    Find the segments of previous_result that have to be recalculated, one window per changed network,
+    windows that share blocks of previous_result are merged, so far apart changes are recalculated separately
+    :param desired_cidr: IPv4Network
+    :param previous_result: list of PyVPCBlock objects
+    :param changed: list of PyVPCBlock objects, added or removed networks overlapping desired_cidr
+    :return: list of tuples (first index, last index, window head address, window tail address), sorted
+    """
+    windows = []
+    for reserved_net in sorted(changed, key=get_reserved_network_key):
+        window = find_update_window(desired_cidr, previous_result,
+                                    max(reserved_net.get_start_address(), desired_cidr[0]),
+                                    min(reserved_net.get_end_address(), desired_cidr[-1]))
+        if windows and window[0] <= windows[-1][1]:
+            if window[1] > windows[-1][1]:
+                windows[-1] = (windows[-1][0], window[1], windows[-1][2], window[3])
+        else:
+            windows.append(window)
+    return windows
+
+
+def update_available_networks(desired_cidr, previous_result, old_reserved_networks, new_reserved_networks):
+    """
+    Update a previous get_available_networks result after the reserved networks inventory changed,
+    only the segment of previous_result that is affected by the changes is recalculated
+    (view find_update_window for details), everything outside it is reused as is from previous_result.
+
+    Inventories passed as lists are indexed (sorted) on every call, which costs about as much as
+    get_available_networks itself, when refreshing repeatedly keep a single PyVPCReservedIndex
+    and pass only the changes to apply_reserved_networks_changes
+
+    :param desired_cidr: IPv4Network
+    :param previous_result: list of PyVPCBlock objects, as returned by get_available_networks
+    :param old_reserved_networks: PyVPCReservedIndex object or list of PyVPCBlock objects,
+                                  used to calculate previous_result
+    :param new_reserved_networks: PyVPCReservedIndex object or list of PyVPCBlock objects
+    :return: tuple of (list of PyVPCBlock objects, change report dict)
+    """
+    new_index = get_reserved_index(new_reserved_networks)
+    added, removed = diff_reserved_networks(old_reserved_networks, new_index)
+    return recalculate_changed_window(desired_cidr, previous_result, new_index, added, removed)
+
+
+def apply_reserved_networks_changes(desired_cidr, previous_result, reserved_index, added, removed):
+    """
+    Apply a change set to reserved_index (in place) and update a previous get_available_networks result,
+    the cost depends on the number of changes (and the size of the affected segment),
+    not on the size of the inventory
+
+    :param desired_cidr: IPv4Network
+    :param previous_result: list of PyVPCBlock objects, as returned by get_available_networks
+    :param reserved_index: PyVPCReservedIndex object, of the networks used to calculate previous_result
+    :param added: list of PyVPCBlock objects
+    :param removed: list of PyVPCBlock objects
+    :return: tuple of (list of PyVPCBlock objects, change report dict)
+    """
+    reserved_index.apply(added, removed)
+    return recalculate_changed_window(desired_cidr, previous_result, reserved_index, list(added), list(removed))
+
+
+def recalculate_changed_window(desired_cidr, previous_result, new_index, added, removed):
+    """
+    Recalculate the segment of previous_result affected by added and removed networks
+    :param desired_cidr: IPv4Network
+    :param previous_result: list of PyVPCBlock objects
+    :param new_index: PyVPCReservedIndex object, after the changes
+    :param added: list of PyVPCBlock objects
+    :param removed: list of PyVPCBlock objects
+    :return: tuple of (list of PyVPCBlock objects, change report dict)
+    """
+    report = {'added': added, 'removed': removed, 'segments_removed': [], 'segments_added': []}
+
+    changed = [x for x in added + removed if desired_cidr.overlaps(x.get_network())]
+    if not changed:
+        return list(previous_result), report
+
+    networks_result = []
+    position = 0
+    windows = find_update_windows(desired_cidr, previous_result, changed)
+    for first_index, last_index, window_head, window_tail in windows:
+        window_networks = new_index.get_overlapping_range(desired_cidr.version, int(window_head), int(window_tail))
+        if not window_networks and window_head == desired_cidr[0] and window_tail == desired_cidr[-1]:
+            segment = [PyVPCBlock(network=desired_cidr, block_available=True)]
+        else:
+            segment = calculate_window_available_blocks(window_head, window_tail, desired_cidr[-1], window_networks)
+
+        report['segments_removed'].extend(previous_result[first_index:last_index + 1])
+        report['segments_added'].extend(segment)
+        networks_result.extend(previous_result[position:first_index])
+        networks_result.extend(segment)
+        position = last_index + 1
+    networks_result.extend(previous_result[position:])
+    return networks_result, report
+
+
 def calculate_suggested_cidr(ranges, prefix, minimal_num_of_addr):
     """
     Get available CIDR (network object), among input ip ranges, according requirements
@@ -361,6 +813,44 @@ def calculate_suggested_cidr(ranges, prefix, minimal_num_of_addr):
     return possible_subnets
 
 
+def calculate_vpc_utilisation(vpc, reserved_subnets):
+    """
+    Calculate free address space of a single vpc
+    :param vpc: PyVPCBlock object
+    :param reserved_subnets: list of PyVPCBlock objects
+    :return: dict
+    """
+    available_addresses = 0
+    for block in get_available_networks(vpc.get_network(), reserved_subnets):
+        if block.block_available:
+            available_addresses += block.get_num_addresses()
+
+    used_addresses = vpc.get_num_addresses() - available_addresses
+    return {'id': vpc.get_id(),
+            'name': vpc.get_name(),
+            'cidr': str(vpc.get_network()),
+            'num_of_addresses': vpc.get_num_addresses(),
+            'used_addresses': used_addresses,
+            'available_addresses': available_addresses,
+            'utilisation': round(100.0 * used_addresses / vpc.get_num_addresses(), 2)}
+
+
+def calculate_vpcs_utilisation(vpcs, subnets_by_vpc, processes=None):
+    """
+    Run calculate_vpc_utilisation for every input vpc,
+    if processes is passed, vpc(s) are calculated across a process pool of that size
+    :param vpcs: list of PyVPCBlock objects
+    :param subnets_by_vpc: dict of vpc id -> list of PyVPCBlock objects
+    :param processes: int
+    :return: list of dicts, same order as vpcs
+    """
+    subnets = [subnets_by_vpc.get(vpc.get_id(), []) for vpc in vpcs]
+    if processes and processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return list(executor.map(calculate_vpc_utilisation, vpcs, subnets))
+    return list(map(calculate_vpc_utilisation, vpcs, subnets))
+
+
 def check_valid_ip_int(value):
     """
     Validate that value is an integer between 0 to 340,282,366,920,938,463,463,374,607,431,768,211,455
@@ -394,6 +884,89 @@ def check_valid_ip_prefix(value):
     return prefix
 
 
+def check_valid_columns(value):
+    """
+    Validate that value is a comma separated list of table column names
+
+    :param value: string
+    :return: list of strings
+    """
+    columns = [column.strip() for column in value.split(',') if column.strip()]
+    for column in columns:
+        if column not in PYVPC_TABLE_COLUMN_NAMES:
+            raise argparse.ArgumentTypeError('{} is an invalid column, valid columns are {}'
+                                             .format(column, ','.join(PYVPC_TABLE_COLUMN_NAMES)))
+    if not columns:
+        raise argparse.ArgumentTypeError('at least one column must be selected')
+    return columns
+
+
+def check_valid_non_negative_int(value):
+    """
+    Validate that value is an integer equal or larger than 0
+
+    :param value: int
+    :return: int
+    """
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError('{} is not a non negative number'.format(number))
+    return number
+
+
+def check_valid_positive_int(value):
+    """
+    Validate that value is an integer larger than 0
+
+    :param value: int
+    :return: int
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError('{} is not a positive number'.format(number))
+    return number
+
+
+def print_pyvpc_objects(pyvpc_objects, output=None, columns=None, offset=0, limit=None):
+    """
+    Print list of PyVPCBlock as json, or as table printed row by row,
+    long ids and names are truncated only if output is limited by columns, offset or limit
+
+    :param pyvpc_objects: list of PyVPCBlock
+    :param output: string, 'json' or None for table
+    :param columns: list of column names, None for all columns (ignored for json)
+    :param offset: int
+    :param limit: int
+    """
+    if output == 'json':
+        stop = None if limit is None else offset + limit
+        print(return_pyvpc_objects_json(pyvpc_objects[offset:stop]))
+    else:
+        truncate = columns is not None or offset > 0 or limit is not None
+        for line in iter_pyvpc_objects_table(pyvpc_objects, columns, offset, limit, truncate):
+            print(line)
+
+
+def print_all_vpcs_report(parser_aws, args):
+    """
+    Print free address space and utilisation of every VPC (--all-vpcs)
+    :param parser_aws: argparse.ArgumentParser, used to report flags that can not be used with --all-vpcs
+    :param args: dict of parsed arguments
+    """
+    for flag in ['suggest_range', 'num_of_addr', 'columns']:
+        if args[flag] is not None:
+            parser_aws.error('--{} can not be used with --all-vpcs'.format(flag.replace('_', '-')))
+
+    vpcs, subnets_by_vpc = get_aws_vpcs_and_subnets(args['region'], args['all_regions'])
+    report = calculate_vpcs_utilisation(vpcs, subnets_by_vpc, args['processes'])
+    stop = None if args['limit'] is None else args['offset'] + args['limit']
+    report = report[args['offset']:stop]
+    if args['output'] == 'json':
+        print(return_vpcs_utilisation_json(report))
+    else:
+        print(return_vpcs_utilisation_string(report))
+
+
 def get_self_version(dist_name):
     """
     Return version number of input distribution name,
@@ -416,12 +989,18 @@ def main():
 
     # Define parses that is shared, and will be used as 'parent' parser to all others
     base_sub_parser = argparse.ArgumentParser(add_help=False)
-    base_sub_parser.add_argument('--cidr-range', help='Check free ranges for current cidr', required=False)
     base_sub_parser.add_argument('--suggest-range', type=check_valid_ip_prefix, required=False,
                                  help='Return all available networks with input prefix (0-32)')
     base_sub_parser.add_argument('--num-of-addr', type=check_valid_ip_int, required=False,
                                  help='Return all available networks that contain at least addresses of num passed')
     base_sub_parser.add_argument('--output', choices=['json'], help='Return output as json', required=False)
+    base_sub_parser.add_argument('--columns', type=check_valid_columns, required=False,
+                                 help='Comma separated table columns to display ({})'
+                                 .format(','.join(PYVPC_TABLE_COLUMN_NAMES)))
+    base_sub_parser.add_argument('--offset', type=check_valid_non_negative_int, default=0, required=False,
+                                 help='Skip first num of ranges')
+    base_sub_parser.add_argument('--limit', type=check_valid_non_negative_int, required=False,
+                                 help='Display at most num of ranges')
 
     # Sub-parser for aws
     parser_aws = subparsers.add_parser('aws', parents=[base_sub_parser])
@@ -429,24 +1008,40 @@ def main():
                             help='valid AWS region, if not selected will use default region configured')
     parser_aws.add_argument('--all-regions', action='store_true',
                             help='Run PyVPC on all AWS regions (app will run much longer)', required=False)
-    parser_aws.add_argument('--vpc', required=False,
-                            help='AWS VPC id or name, return available ranges is specific VPC')
+    aws_target_group = parser_aws.add_mutually_exclusive_group()
+    aws_target_group.add_argument('--cidr-range', help='Check free ranges for current cidr', required=False)
+    aws_target_group.add_argument('--vpc', required=False,
+                                  help='AWS VPC id or name, return available ranges is specific VPC')
+    aws_target_group.add_argument('--all-vpcs', action='store_true', required=False,
+                                  help='Return free address space and utilisation of every VPC '
+                                       '(one row per primary or secondary VPC cidr)')
+    parser_aws.add_argument('--processes', type=check_valid_positive_int, required=False,
+                            help='Number of processes used to calculate --all-vpcs report')
     args = vars(parser.parse_args())
 
     if args['sub_command'] is None:
         parser.print_help()
         exit(0)
 
+    if args['all_vpcs']:
+        print_all_vpcs_report(parser_aws, args)
+        exit(0)
+
+    if args['processes'] is not None:
+        parser_aws.error('--processes can only be used with --all-vpcs')
+
     if not args['cidr_range'] and not args['vpc']:
-        print('--cidr-range or --vpc flags must be provided', file=stderr)
+        print('--cidr-range, --vpc or --all-vpcs flags must be provided', file=stderr)
         exit(1)
 
     network = None
+    reserved_cidrs = []
     try:
         if args['cidr_range']:
             network = PyVPCBlock(network=ipaddress.ip_network(args['cidr_range']))
         elif args['vpc']:
-            network = get_aws_vpc_if_exists(args['vpc'], args['region'])
+            # Vpc and its subnets are fetched together
+            network, reserved_cidrs = get_aws_vpc_and_subnets(args['vpc'], args['region'])
             if not network:  # In case no vpc found with input id/name
                 print('no vpc found with id/name "{}" '.format(args['vpc']), file=stderr)
                 exit(1)
@@ -457,9 +1052,6 @@ def main():
     if args['cidr_range']:
         # Get all not available (used) CIDRs
         reserved_cidrs = get_aws_reserved_networks(args['region'], args['all_regions'])
-    # Case --vpc passed
-    else:
-        reserved_cidrs = get_aws_reserved_subnets(network.get_id())
 
     # Calculate available CIDRs based or input request
     pyvpc_objects = get_available_networks(network.get_network(), reserved_cidrs)
@@ -473,19 +1065,13 @@ def main():
             print(exc)
             exit(1)
         if suggested_net:
-            if args['output'] == 'json':
-                print(return_pyvpc_objects_json(suggested_net))
-            else:
-                print(return_pyvpc_objects_string(suggested_net))
+            print_pyvpc_objects(suggested_net, args['output'], args['columns'], args['offset'], args['limit'])
         else:
             print('no possible available ranges found for input values')
             exit(1)
 
     else:
-        if args['output'] == 'json':
-            print(return_pyvpc_objects_json(pyvpc_objects))
-        else:
-            print(return_pyvpc_objects_string(pyvpc_objects))
+        print_pyvpc_objects(pyvpc_objects, args['output'], args['columns'], args['offset'], args['limit'])
 
 
 if __name__ == "__main__":
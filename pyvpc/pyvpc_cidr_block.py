@@ -56,25 +56,75 @@ class PyVPCBlock(object):
         return self.num_of_addresses
 
 
-def return_pyvpc_objects_string(pyvpc_objects):
+# Table columns of PyVPCBlock output: name, header, value getter, right aligned,
+# IPv4 and IPv6 column width (width of longest possible value, ids and names may be longer)
+PYVPC_TABLE_COLUMNS = [
+    ('lowest_ip', 'Lowest IP', lambda x: x.get_start_address(), False, 15, 39),
+    ('upper_ip', 'Upper IP', lambda x: x.get_end_address(), False, 15, 39),
+    ('num_of_addr', 'Num of Addr', lambda x: x.get_num_addresses(), True, 10, 39),
+    ('prefix', 'Prefix', lambda x: x.get_network_prefix(), True, 2, 3),
+    ('available', 'Available', lambda x: x.block_available, False, 5, 5),
+    # AWS ids are up to 24 chars (subnet-0123456789abcdef0)
+    ('id', 'ID', lambda x: x.get_id(), False, 24, 24),
+    ('name', 'Name', lambda x: x.get_name(), False, 32, 32),
+]
+PYVPC_TABLE_TRUNCATE_MARK = '...'
+PYVPC_TABLE_COLUMN_NAMES = [column[0] for column in PYVPC_TABLE_COLUMNS]
+
+
+def iter_pyvpc_objects_table(pyvpc_objects, columns=None, offset=0, limit=None, truncate=False):
     """
-    Documentation https://github.com/astanin/python-tabulate
+    Yield lines of a github style table (same layout as tabulate tablefmt="github"), row by row,
+    all columns have a fixed width (address and number columns by the ip version of the first object),
+    so rows are printed without loading or scanning the results first,
+    ID and Name values longer than their column spill past the column edge, or are truncated (ending with '...')
+
     :param pyvpc_objects: list of PyVPCBlock
-    :return: string
+    :param columns: list of column names (from PYVPC_TABLE_COLUMN_NAMES), None for all columns
+    :param offset: int, number of objects to skip
+    :param limit: int, max number of objects to display, None for all
+    :param truncate: boolean, truncate values longer than their column
+    :return: generator of strings
     """
-    from tabulate import tabulate
+    from itertools import chain, islice
 
-    table = []
-    # Prepare the table list, that contains lists of values
-    for pyvpc_object in pyvpc_objects:
-        table.append([pyvpc_object.get_start_address(), pyvpc_object.get_end_address(),
-                      pyvpc_object.get_num_addresses(), pyvpc_object.get_network_prefix(),
-                      pyvpc_object.block_available, pyvpc_object.get_id(), pyvpc_object.get_name()])
+    selected = [column for column in PYVPC_TABLE_COLUMNS if columns is None or column[0] in columns]
+    stop = None if limit is None else offset + limit
+    rows = islice(pyvpc_objects, offset, stop)
 
-    # Make sure headers are aligned with number of values is 'table'
-    headers = ["Lowest IP", "Upper IP", "Num of Addr", "Prefix", "Available", "ID", "Name"]
+    first = next(rows, None)
+    rows = chain([first], rows) if first is not None else []
+    is_ipv6 = first is not None and first.get_start_address().version == 6
 
-    return tabulate(table, headers, tablefmt="github")
+    # Same as tabulate, leave at least 2 spaces next to headers
+    widths = [max(len(column[1]) + 2, column[5] if is_ipv6 else column[4]) for column in selected]
+
+    def format_line(values):
+        cells = []
+        for value, width, column in zip(values, widths, selected):
+            value = '' if value is None else str(value)
+            if truncate and len(value) > width:
+                value = value[:width - len(PYVPC_TABLE_TRUNCATE_MARK)] + PYVPC_TABLE_TRUNCATE_MARK
+            cells.append(value.rjust(width) if column[3] else value.ljust(width))
+        return '| ' + ' | '.join(cells) + ' |'
+
+    yield format_line([column[1] for column in selected])
+    yield '|' + '|'.join('-' * (width + 2) for width in widths) + '|'
+    for pyvpc_object in rows:
+        yield format_line([column[2](pyvpc_object) for column in selected])
+
+
+def return_pyvpc_objects_string(pyvpc_objects, columns=None, offset=0, limit=None, truncate=False):
+    """
+    Return list of PyVPCBlock as github style table, view iter_pyvpc_objects_table for details
+    :param pyvpc_objects: list of PyVPCBlock
+    :param columns: list of column names, None for all columns
+    :param offset: int
+    :param limit: int
+    :param truncate: boolean
+    :return: string
+    """
+    return '\n'.join(iter_pyvpc_objects_table(pyvpc_objects, columns, offset, limit, truncate))
 
 
 def return_pyvpc_objects_json(pyvpc_objects):
@@ -94,3 +144,39 @@ def return_pyvpc_objects_json(pyvpc_objects):
                        'id': pyvpc_object.get_id(),
                        'name': pyvpc_object.get_name()})
     return dumps({'ranges': result})
+
+
+def return_vpcs_utilisation_string(vpcs_utilisation):
+    """
+    Documentation https://github.com/astanin/python-tabulate
+    :param vpcs_utilisation: list of dicts, as returned by calculate_vpcs_utilisation
+    :return: string
+    """
+    from tabulate import tabulate
+
+    table = []
+    total_addresses = 0
+    total_used = 0
+    for vpc in vpcs_utilisation:
+        table.append([vpc['id'], vpc['name'], vpc['cidr'], vpc['num_of_addresses'], vpc['used_addresses'],
+                      vpc['available_addresses'], vpc['utilisation']])
+        total_addresses += vpc['num_of_addresses']
+        total_used += vpc['used_addresses']
+
+    if total_addresses:
+        table.append(['Total', None, None, total_addresses, total_used, total_addresses - total_used,
+                      round(100.0 * total_used / total_addresses, 2)])
+
+    headers = ["ID", "Name", "CIDR", "Num of Addr", "Used Addr", "Available Addr", "Utilisation %"]
+
+    return tabulate(table, headers, tablefmt="github")
+
+
+def return_vpcs_utilisation_json(vpcs_utilisation):
+    """
+    Return list of vpc utilisation dicts as json
+    :param vpcs_utilisation: list of dicts, as returned by calculate_vpcs_utilisation
+    :return: json formatted string
+    """
+    from json import dumps
+    return dumps({'vpcs': vpcs_utilisation})
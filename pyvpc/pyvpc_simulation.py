@@ -0,0 +1,134 @@
+from heapq import merge
+
+try:
+    from pyvpc import calculate_available_blocks, get_reserved_network_key
+    from pyvpc_cidr_block import PyVPCBlock
+except ImportError:  # 'pyvpc' may resolve to this package instead of the pyvpc.py module
+    from .pyvpc import calculate_available_blocks, get_reserved_network_key
+    from .pyvpc_cidr_block import PyVPCBlock
+
+
+class PyVPCSimulation(object):
+    """
+    Copy-on-write overlay of proposed additions and removals over a PyVPCReservedIndex,
+    the index is never modified, and changes made before a fork are frozen in a layer shared by both
+    simulations, so many candidate plans can fork from the same base (or from a shared partial plan),
+    and later changes to any of them are not seen by the others
+    """
+    def __init__(self, index, parent=None):
+        self.index = index
+        self.parent = parent
+        self.added = []
+        self.removed = set()
+
+    def fork(self):
+        """
+        Return a new simulation that starts with all changes of this one,
+        changes made so far move to a frozen layer, and this simulation continues on a new (empty) layer
+        :return: PyVPCSimulation object
+        """
+        frozen = PyVPCSimulation(self.index, parent=self.parent)
+        frozen.added, frozen.removed = self.added, self.removed
+        self.parent, self.added, self.removed = frozen, [], set()
+        return PyVPCSimulation(self.index, parent=frozen)
+
+    def add(self, reserved_net):
+        """
+        Propose a new reserved network
+        :param reserved_net: PyVPCBlock object
+        :return: PyVPCSimulation object (self)
+        """
+        self.added.append(reserved_net)
+        return self
+
+    def remove(self, reserved_net):
+        """
+        Propose removal of a reserved network, every copy of it visible at this point is removed
+        (of the index, added by parent simulations, or added earlier to this one),
+        networks are matched by addresses, id and name. Networks added after the removal are kept
+        :param reserved_net: PyVPCBlock object
+        :return: PyVPCSimulation object (self)
+        """
+        key = get_reserved_network_key(reserved_net)
+        self.added = [x for x in self.added if get_reserved_network_key(x) != key]
+        self.removed.add(key)
+        return self
+
+    def get_layers(self):
+        layers = []
+        simulation = self
+        while simulation is not None:
+            layers.append(simulation)
+            simulation = simulation.parent
+        return list(reversed(layers))
+
+    def get_changes(self):
+        """
+        Return proposed networks of this simulation and its parents that were not removed later on,
+        and keys of all removed networks, in a single pass over the layers
+        :return: tuple of (list of PyVPCBlock objects, set of keys)
+        """
+        added_layers = []
+        removed = set()
+        # A removal only hides networks of the index, and networks added by previous layers
+        for layer in reversed(self.get_layers()):
+            added_layers.append([x for x in layer.added if get_reserved_network_key(x) not in removed])
+            removed.update(layer.removed)
+        return [x for added in reversed(added_layers) for x in added], removed
+
+    def get_added(self):
+        """
+        Return proposed networks of this simulation and its parents, that were not removed later on
+        :return: list of PyVPCBlock objects
+        """
+        return self.get_changes()[0]
+
+    def get_overlapping(self, network):
+        """
+        Return reserved networks overlapping input network after applying proposed changes, sorted by network
+        :param network: IPv4Network or IPv6Network
+        :return: list of PyVPCBlock objects
+        """
+        added, removed = self.get_changes()
+        base = self.index.get_overlapping(network)
+        if removed:
+            base = [x for x in base if get_reserved_network_key(x) not in removed]
+
+        added = [x for x in added
+                 if x.get_start_address().version == network.version and network.overlaps(x.get_network())]
+        if not added:
+            return base
+        return list(merge(base, sorted(added, key=get_reserved_network_key), key=get_reserved_network_key))
+
+    def get_collisions(self):
+        """
+        Return proposed networks that overlap other reserved networks (existing or proposed),
+        each pair of overlapping proposed networks is returned once
+        :return: list of tuples (proposed PyVPCBlock object, overlapping PyVPCBlock object)
+        """
+        added, removed = self.get_changes()
+        collisions = []
+        for proposed in added:
+            for reserved_net in self.index.get_overlapping(proposed.get_network()):
+                if get_reserved_network_key(reserved_net) not in removed:
+                    collisions.append((proposed, reserved_net))
+
+        # Sorted by start address, a proposed network overlaps the following ones that start before its end
+        proposed_keys = sorted(((get_reserved_network_key(x), x) for x in added), key=lambda x: x[0])
+        for index, (key, proposed) in enumerate(proposed_keys):
+            for other_key, other in proposed_keys[index + 1:]:
+                if other_key[0] != key[0] or other_key[1] > -key[2]:
+                    break
+                collisions.append((proposed, other))
+        return collisions
+
+    def get_available_networks(self, desired_cidr):
+        """
+        Same as get_available_networks(desired_cidr, reserved networks after proposed changes)
+        :param desired_cidr: IPv4Network or IPv6Network
+        :return: list of PyVPCBlock objects
+        """
+        overlapping_networks = self.get_overlapping(desired_cidr)
+        if not overlapping_networks:
+            return [PyVPCBlock(network=desired_cidr, block_available=True)]
+        return calculate_available_blocks(desired_cidr[0], desired_cidr[-1], overlapping_networks)
@@ -0,0 +1,261 @@
+"""
+Compact binary snapshot of PyVPCBlock lists
+
+    | header | records (fixed width) | string table offsets | string table data |
+
+header:   magic, format version, flags, number of records, number of strings
+record:   ip version, prefix (255 if none), available, (pad), id/name/type string indexes (NO_STRING if none),
+          start, end and running max end (largest end address of this and all previous records) addresses,
+          each address stored as two 64 bit integers (high, low)
+strings:  number of strings + 1 offsets into the utf-8 data, string i is data[offsets[i]:offsets[i + 1]]
+
+All integers are little endian, records are read directly from the mapped file,
+so opening a snapshot costs the same no matter how many records it holds.
+"""
+import ipaddress
+import mmap
+import struct
+
+try:
+    from pyvpc_cidr_block import PyVPCBlock
+except ModuleNotFoundError:
+    from .pyvpc_cidr_block import PyVPCBlock
+
+SNAPSHOT_MAGIC = b'PYVPCSNP'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FLAG_SORTED = 1
+
+HEADER = struct.Struct('<8sHHII')
+RECORD = struct.Struct('<BBBxIIIQQQQQQ')
+OFFSET = struct.Struct('<I')
+
+NO_PREFIX = 255
+NO_STRING = 0xFFFFFFFF
+LOW_64_MASK = (1 << 64) - 1
+
+
+def split_address(address):
+    address = int(address)
+    return address >> 64, address & LOW_64_MASK
+
+
+def dumps_pyvpc_objects(pyvpc_objects):
+    """
+    Return list of PyVPCBlock as snapshot bytes
+    :param pyvpc_objects: list of PyVPCBlock
+    :return: bytes
+    """
+    strings = []
+    string_indexes = {}
+
+    def string_index(value):
+        if value is None:
+            return NO_STRING
+        if value not in string_indexes:
+            string_indexes[value] = len(strings)
+            strings.append(value.encode('utf-8'))
+        return string_indexes[value]
+
+    records = bytearray()
+    is_sorted = True
+    last_start = -1
+    max_end = 0
+    for pyvpc_object in pyvpc_objects:
+        start = int(pyvpc_object.get_start_address())
+        end = int(pyvpc_object.get_end_address())
+        prefix = pyvpc_object.get_network_prefix()
+        if start < last_start:
+            is_sorted = False
+        last_start = start
+        max_end = max(max_end, end)
+
+        records += RECORD.pack(pyvpc_object.get_start_address().version,
+                               NO_PREFIX if prefix is None else prefix,
+                               1 if pyvpc_object.block_available else 0,
+                               string_index(pyvpc_object.get_id()),
+                               string_index(pyvpc_object.get_name()),
+                               string_index(pyvpc_object.get_type()),
+                               *split_address(start), *split_address(end), *split_address(max_end))
+
+    offsets = bytearray()
+    position = 0
+    for value in strings:
+        offsets += OFFSET.pack(position)
+        position += len(value)
+    offsets += OFFSET.pack(position)
+
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, SNAPSHOT_FLAG_SORTED if is_sorted else 0,
+                         len(records) // RECORD.size, len(strings))
+    return b''.join([header, bytes(records), bytes(offsets)] + strings)
+
+
+def dump_pyvpc_objects(pyvpc_objects, path):
+    """
+    Write list of PyVPCBlock as snapshot file
+    :param pyvpc_objects: list of PyVPCBlock
+    :param path: string
+    """
+    with open(path, 'wb') as fh:
+        fh.write(dumps_pyvpc_objects(pyvpc_objects))
+
+
+def load_pyvpc_snapshot(path):
+    """
+    Memory map input snapshot file, records are decoded only when accessed
+    :param path: string
+    :return: PyVPCSnapshot object
+    """
+    with open(path, 'rb') as fh:
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return PyVPCSnapshot(mapped)
+    except ValueError:
+        mapped.close()
+        raise
+
+
+class PyVPCSnapshot(object):
+    """
+    Read only, list like view over snapshot bytes (or mmap) returned by dumps_pyvpc_objects
+    """
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        try:
+            self.read_header()
+        except ValueError:
+            # Release the view, so the caller can close the buffer (mmap) it was created over
+            self.view.release()
+            raise
+
+    def read_header(self):
+        if len(self.view) < HEADER.size:
+            raise ValueError('not a pyvpc snapshot')
+        magic, version, flags, self.num_of_records, self.num_of_strings = HEADER.unpack_from(self.view, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError('not a pyvpc snapshot')
+        if version != SNAPSHOT_VERSION:
+            raise ValueError('unsupported pyvpc snapshot version {}'.format(version))
+
+        self.is_sorted = bool(flags & SNAPSHOT_FLAG_SORTED)
+        self.offsets_position = HEADER.size + self.num_of_records * RECORD.size
+        self.strings_position = self.offsets_position + (self.num_of_strings + 1) * OFFSET.size
+
+        # Last string offset is the length of the string table data, so the buffer size must match exactly
+        if len(self.view) < self.strings_position:
+            raise ValueError('truncated pyvpc snapshot')
+        self.strings_length, = OFFSET.unpack_from(self.view, self.strings_position - OFFSET.size)
+        if self.strings_position + self.strings_length != len(self.view):
+            raise ValueError('truncated or corrupt pyvpc snapshot')
+
+    def __len__(self):
+        return self.num_of_records
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.num_of_records
+        if not 0 <= index < self.num_of_records:
+            raise IndexError('snapshot index out of range')
+        return self.get_block(index)
+
+    def __iter__(self):
+        for index in range(self.num_of_records):
+            yield self.get_block(index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.view.release()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def get_record(self, index):
+        return RECORD.unpack_from(self.view, HEADER.size + index * RECORD.size)
+
+    def get_string(self, string_index):
+        if string_index == NO_STRING:
+            return None
+        if string_index >= self.num_of_strings:
+            raise ValueError('corrupt pyvpc snapshot, string index {} out of range'.format(string_index))
+        start, = OFFSET.unpack_from(self.view, self.offsets_position + string_index * OFFSET.size)
+        end, = OFFSET.unpack_from(self.view, self.offsets_position + (string_index + 1) * OFFSET.size)
+        if not start <= end <= self.strings_length:
+            raise ValueError('corrupt pyvpc snapshot, string {} out of string table'.format(string_index))
+        return bytes(self.view[self.strings_position + start:self.strings_position + end]).decode('utf-8')
+
+    def get_bounds(self, index):
+        """
+        Return start and end address of record at index as integers, without building a PyVPCBlock
+        :param index: int
+        :return: tuple of (int, int)
+        """
+        record = self.get_record(index)
+        return (record[6] << 64) | record[7], (record[8] << 64) | record[9]
+
+    def get_max_end(self, index):
+        record = self.get_record(index)
+        return (record[10] << 64) | record[11]
+
+    def bisect(self, predicate):
+        """
+        Return first index where predicate is False, predicate must be True for a prefix of the records only
+        :param predicate: function receiving record index
+        :return: int
+        """
+        low, high = 0, self.num_of_records
+        while low < high:
+            middle = (low + high) // 2
+            if predicate(middle):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get_block(self, index):
+        """
+        Decode record at index
+        :param index: int
+        :return: PyVPCBlock object
+        """
+        ip_version, prefix, available, id_index, name_index, type_index, \
+            start_high, start_low, end_high, end_low = self.get_record(index)[:10]
+        address_class = ipaddress.IPv4Address if ip_version == 4 else ipaddress.IPv6Address
+        start = address_class((start_high << 64) | start_low)
+
+        if prefix != NO_PREFIX:
+            network = ipaddress.ip_network((start, prefix))
+            return PyVPCBlock(network=network, resource_id=self.get_string(id_index),
+                              name=self.get_string(name_index), resource_type=self.get_string(type_index),
+                              block_available=bool(available))
+        return PyVPCBlock(start_address=start, end_address=address_class((end_high << 64) | end_low),
+                          resource_id=self.get_string(id_index), name=self.get_string(name_index),
+                          resource_type=self.get_string(type_index), block_available=bool(available))
+
+    def get_overlapping(self, network):
+        """
+        Return all blocks overlapping input network, only matching records are decoded,
+        if snapshot records are sorted by start address, the scan starts after a binary search
+        :param network: IPv4Network or IPv6Network
+        :return: list of PyVPCBlock objects
+        """
+        lower = int(network.network_address)
+        upper = int(network.broadcast_address)
+
+        first = 0
+        last = self.num_of_records
+        if self.is_sorted:
+            # Records before 'first' (all their end addresses are below lower) can not overlap
+            first = self.bisect(lambda index: self.get_max_end(index) < lower)
+            # Records from 'last' on (start above upper) can not overlap
+            last = self.bisect(lambda index: self.get_bounds(index)[0] <= upper)
+
+        result = []
+        for index in range(first, last):
+            start, end = self.get_bounds(index)
+            if start <= upper and end >= lower and self.get_record(index)[0] == network.version:
+                result.append(self.get_block(index))
+        return result
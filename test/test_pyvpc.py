@@ -1,9 +1,21 @@
 import unittest
 from argparse import ArgumentTypeError
-from ipaddress import IPv4Network, IPv4Address
-
-from pyvpc.pyvpc import get_available_networks, check_valid_ip_int, check_valid_ip_prefix, calculate_suggested_cidr
-from pyvpc.pyvpc_cidr_block import PyVPCBlock, return_pyvpc_objects_json
+import io
+import mmap
+import os
+import tempfile
+import threading
+from ipaddress import IPv4Network, IPv4Address, IPv6Network, ip_network
+from contextlib import redirect_stdout
+from unittest import mock
+
+from pyvpc.pyvpc import get_available_networks, check_valid_ip_int, check_valid_ip_prefix, calculate_suggested_cidr, \
+    check_valid_columns, check_valid_positive_int, print_pyvpc_objects, \
+    get_aws_vpc_and_subnets, get_aws_vpc_if_exists, get_aws_vpcs_and_subnets, calculate_vpcs_utilisation, \
+    diff_reserved_networks, update_available_networks, apply_reserved_networks_changes, \
+    PyVPCReservedIndex
+from pyvpc.pyvpc_cidr_block import PyVPCBlock, return_pyvpc_objects_json, return_pyvpc_objects_string
+from pyvpc.pyvpc_snapshot import PyVPCSnapshot, HEADER, dumps_pyvpc_objects, dump_pyvpc_objects, load_pyvpc_snapshot
 
 
 class IPv4Test(unittest.TestCase):
@@ -186,6 +198,440 @@ class IPv4Test(unittest.TestCase):
                          '"id": "vpc-some-vpc-id-here", '
                          '"name": "arie-test-vpc"}]}')
 
+    def test_return_pyvpc_objects_string(self):
+        cidr_calc_ranges = get_available_networks(self.cidr_requested, [self.reserved_pyvpc_block])
+        self.assertEqual(return_pyvpc_objects_string(cidr_calc_ranges),
+                         '| Lowest IP       | Upper IP        |   Num of Addr |   Prefix | Available   '
+                         '| ID                       | Name                             |\n'
+                         '|-----------------|-----------------|---------------|----------|-------------'
+                         '|--------------------------|----------------------------------|\n'
+                         '| 10.0.0.0        | 10.89.255.255   |       5898240 |          | True        '
+                         '|                          |                                  |\n'
+                         '| 10.90.0.0       | 10.90.255.255   |         65536 |       16 | False       '
+                         '| vpc-some-vpc-id-here     | arie-test-vpc                    |\n'
+                         '| 10.91.0.0       | 10.255.255.255  |      10813440 |          | True        '
+                         '|                          |                                  |')
+
+        # Selected columns, skip first range and display single range
+        self.assertEqual(return_pyvpc_objects_string(cidr_calc_ranges, ['lowest_ip', 'prefix', 'name'], 1, 1),
+                         '| Lowest IP       |   Prefix | Name                             |\n'
+                         '|-----------------|----------|----------------------------------|\n'
+                         '| 10.90.0.0       |       16 | arie-test-vpc                    |')
+
+        # Names longer than the Name column spill past it, or are truncated if requested
+        long_name = [PyVPCBlock(network=IPv4Network('10.90.0.0/16'), name='n' * 40)]
+        self.assertEqual(return_pyvpc_objects_string(long_name, ['name']).splitlines()[2],
+                         '| ' + 'n' * 40 + ' |')
+        self.assertEqual(return_pyvpc_objects_string(long_name, ['name'], truncate=True).splitlines()[2],
+                         '| ' + 'n' * 29 + '... |')
+
+        # Default cli output never truncates, output limited by columns/offset/limit does
+        for kwargs, displayed in [({}, 'n' * 40), ({'limit': 1}, 'n' * 29 + '...')]:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                print_pyvpc_objects(long_name, **kwargs)
+            self.assertIn(displayed + ' |', output.getvalue())
+
+        # IPv6 columns are wider, and offset after last range returns headers only
+        ipv6_ranges = [PyVPCBlock(network=IPv6Network('2001:db8::/32'), block_available=True)]
+        self.assertEqual(len(return_pyvpc_objects_string(ipv6_ranges, ['lowest_ip']).splitlines()[2]), 43)
+        self.assertEqual(len(return_pyvpc_objects_string(ipv6_ranges, offset=1).splitlines()), 2)
+
+    def test_check_valid_columns(self):
+        self.assertEqual(check_valid_columns('lowest_ip, upper_ip,name'), ['lowest_ip', 'upper_ip', 'name'])
+        self.assertRaises(ArgumentTypeError, check_valid_columns, 'lowest_ip,cidr')
+        self.assertRaises(ArgumentTypeError, check_valid_columns, ',')
+
+    def test_check_valid_positive_int(self):
+        self.assertEqual(check_valid_positive_int('4'), 4)
+        self.assertRaises(ArgumentTypeError, check_valid_positive_int, '0')
+        self.assertRaises(ArgumentTypeError, check_valid_positive_int, '-3')
+
+
+def pyvpc_objects_as_tuples(pyvpc_objects):
+    return [(x.get_network(), x.get_start_address(), x.get_end_address(), x.get_num_addresses(),
+             x.get_network_prefix(), x.block_available, x.get_id(), x.get_name(), x.get_type())
+            for x in pyvpc_objects]
+
+
+def get_test_reserved_networks(*extra_cidrs):
+    """
+    Reserved networks shared by tests, 10.8.0.0/14 (vpc-2) with nested 10.10.0.0/16 (vpc-1) and 10.50.0.0/16 (vpc-3),
+    extra cidrs are appended as vpc-4, vpc-5 ...
+    """
+    reserved_networks = [
+        PyVPCBlock(network=IPv4Network('10.10.0.0/16'), resource_id='vpc-1', name='dev', resource_type='vpc'),
+        PyVPCBlock(network=IPv4Network('10.8.0.0/14'), resource_id='vpc-2', name='dev', resource_type='vpc'),
+        PyVPCBlock(network=IPv4Network('10.50.0.0/16'), resource_id='vpc-3'),
+    ]
+    for index, cidr in enumerate(extra_cidrs):
+        reserved_networks.append(PyVPCBlock(network=ip_network(cidr), resource_id='vpc-{}'.format(index + 4)))
+    return reserved_networks
+
+
+class IncrementalUpdateTest(unittest.TestCase):
+    def setUp(self):
+        self.cidr_requested = IPv4Network('10.0.0.0/8')
+        self.reserved_networks = get_test_reserved_networks('10.60.0.0/24', '192.168.20.0/24')
+        self.previous_result = get_available_networks(self.cidr_requested, self.reserved_networks)
+
+    def test_diff_reserved_networks(self):
+        new_reserved = self.reserved_networks[1:] + [PyVPCBlock(network=IPv4Network('10.70.0.0/16'))]
+        added, removed = diff_reserved_networks(self.reserved_networks, new_reserved)
+
+        self.assertEqual([x.get_network() for x in added], [IPv4Network('10.70.0.0/16')])
+        self.assertEqual([x.get_id() for x in removed], ['vpc-1'])
+        self.assertEqual(diff_reserved_networks(self.reserved_networks, list(reversed(self.reserved_networks))),
+                         ([], []))
+
+    def test_update_available_networks(self):
+        changes = [
+            # added inside a free range
+            self.reserved_networks + [PyVPCBlock(network=IPv4Network('10.70.0.0/16'))],
+            # removed a nested network
+            self.reserved_networks[1:],
+            # removed the outer network
+            self.reserved_networks[:1] + self.reserved_networks[2:],
+            # filled a whole free range, so neighbour reserved ranges touch
+            self.reserved_networks + [PyVPCBlock(network=IPv4Network('10.51.0.0/16')),
+                                      PyVPCBlock(network=IPv4Network('10.52.0.0/14')),
+                                      PyVPCBlock(network=IPv4Network('10.56.0.0/14'))],
+            # added network that covers the whole desired cidr
+            self.reserved_networks + [PyVPCBlock(network=IPv4Network('10.0.0.0/7'))],
+            # removed all networks
+            [],
+        ]
+        for new_reserved in changes:
+            result, report = update_available_networks(self.cidr_requested, self.previous_result,
+                                                       self.reserved_networks, new_reserved)
+            self.assertEqual(pyvpc_objects_as_tuples(result),
+                             pyvpc_objects_as_tuples(get_available_networks(self.cidr_requested, new_reserved)))
+
+    def test_update_available_networks_report(self):
+        new_reserved = self.reserved_networks + [PyVPCBlock(network=IPv4Network('10.70.0.0/16'), resource_id='new')]
+        result, report = update_available_networks(self.cidr_requested, self.previous_result,
+                                                   self.reserved_networks, new_reserved)
+
+        self.assertEqual([x.get_id() for x in report['added']], ['new'])
+        self.assertEqual(report['removed'], [])
+        # Only the free range 10.60.1.0 - 10.255.255.255 is replaced
+        self.assertEqual(pyvpc_objects_as_tuples(report['segments_removed']),
+                         pyvpc_objects_as_tuples(self.previous_result[-1:]))
+        self.assertEqual([(str(x.get_start_address()), x.block_available) for x in report['segments_added']],
+                         [('10.60.1.0', True), ('10.70.0.0', False), ('10.71.0.0', True)])
+        # Reused blocks are the same objects as in previous result
+        self.assertIs(result[0], self.previous_result[0])
+
+        # Changes outside desired cidr do not touch previous result
+        result, report = update_available_networks(self.cidr_requested, self.previous_result,
+                                                   self.reserved_networks, self.reserved_networks[:-1])
+        self.assertEqual(result, self.previous_result)
+        self.assertEqual(report['segments_added'], [])
+
+    def test_update_available_networks_index(self):
+        # Indexes built once are reused between refreshes, the new index is the old one of the next refresh
+        old_index = PyVPCReservedIndex(self.reserved_networks)
+        previous_result = self.previous_result
+        for new_reserved in [self.reserved_networks + [PyVPCBlock(network=IPv4Network('10.70.0.0/16'))],
+                             self.reserved_networks[1:],
+                             self.reserved_networks[1:] + [PyVPCBlock(network=IPv4Network('10.9.0.0/16'))]]:
+            new_index = PyVPCReservedIndex(new_reserved)
+            previous_result, report = update_available_networks(self.cidr_requested, previous_result,
+                                                                old_index, new_index)
+            self.assertEqual(pyvpc_objects_as_tuples(previous_result),
+                             pyvpc_objects_as_tuples(get_available_networks(self.cidr_requested, new_reserved)))
+            old_index = new_index
+
+    def test_apply_reserved_networks_changes(self):
+        # A single index is kept and updated in place across refreshes
+        reserved_index = PyVPCReservedIndex(self.reserved_networks)
+        reserved_networks = list(self.reserved_networks)
+        previous_result = self.previous_result
+        for added, removed in [([PyVPCBlock(network=IPv4Network('10.70.0.0/16'))], []),
+                               # far apart changes are recalculated in separate windows
+                               ([PyVPCBlock(network=IPv4Network('10.9.0.0/16')),
+                                 PyVPCBlock(network=IPv4Network('10.200.0.0/16'))], [reserved_networks[1]]),
+                               ([], reserved_networks[:1])]:
+            reserved_networks = [x for x in reserved_networks if x not in removed] + added
+            previous_result, report = apply_reserved_networks_changes(self.cidr_requested, previous_result,
+                                                                      reserved_index, added, removed)
+            self.assertEqual(pyvpc_objects_as_tuples(previous_result),
+                             pyvpc_objects_as_tuples(get_available_networks(self.cidr_requested, reserved_networks)))
+            self.assertEqual(reserved_index.max_ends, PyVPCReservedIndex(reserved_networks).max_ends)
+
+        self.assertRaises(ValueError, reserved_index.apply, [], [PyVPCBlock(network=IPv4Network('10.1.0.0/16'))])
+
+
+class SimulationTest(unittest.TestCase):
+    def setUp(self):
+        self.cidr_requested = IPv4Network('10.0.0.0/8')
+        self.reserved_networks = get_test_reserved_networks('192.168.20.0/24', '2001:db8::/32')
+        self.index = PyVPCReservedIndex(self.reserved_networks)
+
+    def test_reserved_index_overlapping(self):
+        self.assertEqual([x.get_id() for x in self.index.get_overlapping(IPv4Network('10.10.5.0/24'))],
+                         ['vpc-2', 'vpc-1'])
+        self.assertEqual([x.get_id() for x in self.index.get_overlapping(self.cidr_requested)],
+                         ['vpc-2', 'vpc-1', 'vpc-3'])
+        self.assertEqual([x.get_id() for x in self.index.get_overlapping(IPv6Network('2001:db8:1::/48'))], ['vpc-5'])
+        self.assertEqual(self.index.get_overlapping(IPv4Network('172.16.0.0/12')), [])
+
+    def test_simulation_available_networks(self):
+        added = PyVPCBlock(network=IPv4Network('10.70.0.0/16'), resource_id='vpc-new')
+        simulation = self.index.simulate().add(added).remove(self.reserved_networks[0])
+
+        self.assertEqual(pyvpc_objects_as_tuples(simulation.get_available_networks(self.cidr_requested)),
+                         pyvpc_objects_as_tuples(get_available_networks(self.cidr_requested,
+                                                                        self.reserved_networks[1:] + [added])))
+        self.assertEqual(simulation.get_collisions(), [])
+
+        # Index is not modified by simulation
+        self.assertEqual(pyvpc_objects_as_tuples(self.index.simulate().get_available_networks(self.cidr_requested)),
+                         pyvpc_objects_as_tuples(get_available_networks(self.cidr_requested,
+                                                                        self.reserved_networks)))
+
+    def test_simulation_fork(self):
+        added = PyVPCBlock(network=IPv4Network('10.70.0.0/16'), resource_id='vpc-new')
+        plan = self.index.simulate().add(added)
+        colliding_plan = plan.fork().add(PyVPCBlock(network=IPv4Network('10.50.128.0/17'), resource_id='vpc-bad'))
+        removing_plan = plan.fork().remove(self.reserved_networks[2]).remove(added)
+
+        self.assertEqual([(x.get_id(), y.get_id()) for x, y in colliding_plan.get_collisions()],
+                         [('vpc-bad', 'vpc-3')])
+        # Parent plan does not see changes of its forks
+        self.assertEqual(plan.get_collisions(), [])
+        self.assertEqual([x.get_id() for x in plan.get_overlapping(self.cidr_requested)],
+                         ['vpc-2', 'vpc-1', 'vpc-3', 'vpc-new'])
+        self.assertEqual([x.get_id() for x in removing_plan.get_overlapping(self.cidr_requested)],
+                         ['vpc-2', 'vpc-1'])
+
+        # Nothing reserved left in 10.64.0.0/10
+        self.assertEqual(removing_plan.get_available_networks(IPv4Network('10.64.0.0/10'))[0].get_network(),
+                         IPv4Network('10.64.0.0/10'))
+
+    def test_simulation_parent_changed_after_fork(self):
+        plan = self.index.simulate().add(PyVPCBlock(network=IPv4Network('10.70.0.0/16'), resource_id='vpc-new'))
+        child = plan.fork()
+        plan.add(PyVPCBlock(network=IPv4Network('10.80.0.0/16'), resource_id='vpc-later')).remove(
+            self.reserved_networks[2])
+
+        # Child only sees the parent changes made before the fork
+        self.assertEqual([x.get_id() for x in child.get_overlapping(self.cidr_requested)],
+                         ['vpc-2', 'vpc-1', 'vpc-3', 'vpc-new'])
+        self.assertEqual([x.get_id() for x in plan.get_overlapping(self.cidr_requested)],
+                         ['vpc-2', 'vpc-1', 'vpc-new', 'vpc-later'])
+
+    def test_simulation_remove_across_fork(self):
+        # Removal drops every visible copy, in the same simulation layer or after a fork
+        existing = PyVPCBlock(network=IPv4Network('10.50.0.0/16'), resource_id='vpc-3')
+        same_layer = self.index.simulate().add(existing).remove(existing)
+        forked = self.index.simulate().add(existing).fork().remove(existing)
+        for simulation in [same_layer, forked]:
+            self.assertEqual([x.get_id() for x in simulation.get_overlapping(self.cidr_requested)],
+                             ['vpc-2', 'vpc-1'])
+            self.assertEqual(simulation.get_added(), [])
+
+        # Networks added after a removal are kept
+        readded = self.index.simulate().remove(existing).add(existing)
+        self.assertEqual([x.get_id() for x in readded.get_overlapping(self.cidr_requested)],
+                         ['vpc-2', 'vpc-1', 'vpc-3'])
+
+    def test_simulation_collisions_reported_once(self):
+        first = PyVPCBlock(network=IPv4Network('10.70.0.0/16'), resource_id='vpc-first')
+        second = PyVPCBlock(network=IPv4Network('10.70.128.0/17'), resource_id='vpc-second')
+        simulation = self.index.simulate().add(first).fork().add(second)
+        self.assertEqual([(x.get_id(), y.get_id()) for x, y in simulation.get_collisions()],
+                         [('vpc-first', 'vpc-second')])
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.blocks = get_available_networks(IPv4Network('10.0.0.0/8'), get_test_reserved_networks())
+
+    def assertBlocksEqual(self, first, second):
+        self.assertEqual(pyvpc_objects_as_tuples(first), pyvpc_objects_as_tuples(second))
+
+    def test_snapshot_round_trip(self):
+        snapshot = PyVPCSnapshot(dumps_pyvpc_objects(self.blocks))
+
+        self.assertTrue(snapshot.is_sorted)
+        self.assertBlocksEqual(list(snapshot), self.blocks)
+        self.assertBlocksEqual([snapshot[-1]], [self.blocks[-1]])
+        self.assertEqual(snapshot.get_bounds(0), (int(IPv4Address('10.0.0.0')), int(IPv4Address('10.7.255.255'))))
+        self.assertRaises(IndexError, snapshot.__getitem__, len(self.blocks))
+        self.assertRaises(ValueError, PyVPCSnapshot, b'not a snapshot header')
+        self.assertRaises(ValueError, PyVPCSnapshot, b'PYVPC')
+
+        # Truncated inside records, inside string table, or with trailing garbage
+        snapshot_bytes = dumps_pyvpc_objects(self.blocks)
+        self.assertRaises(ValueError, PyVPCSnapshot, snapshot_bytes[:100])
+        self.assertRaises(ValueError, PyVPCSnapshot, snapshot_bytes[:-1])
+        self.assertRaises(ValueError, PyVPCSnapshot, snapshot_bytes + b'\x00')
+
+        # String index of a record outside the string table
+        corrupt_bytes = bytearray(dumps_pyvpc_objects([PyVPCBlock(network=IPv4Network('10.0.0.0/16'), name='one')]))
+        corrupt_bytes[HEADER.size + 8:HEADER.size + 12] = (7).to_bytes(4, 'little')
+        self.assertRaises(ValueError, PyVPCSnapshot(bytes(corrupt_bytes)).get_block, 0)
+
+        ipv6_blocks = [PyVPCBlock(network=IPv6Network('2001:db8::/32'), name='v6')]
+        self.assertBlocksEqual(list(PyVPCSnapshot(dumps_pyvpc_objects(ipv6_blocks))), ipv6_blocks)
+
+    def test_snapshot_file_overlapping(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        dump_pyvpc_objects(self.blocks, path)
+
+        with load_pyvpc_snapshot(path) as snapshot:
+            self.assertEqual(len(snapshot), 6)
+            # 10.10.0.0/16 is nested inside 10.8.0.0/14, both should be found
+            self.assertEqual([x.get_id() for x in snapshot.get_overlapping(IPv4Network('10.10.5.0/24'))],
+                             ['vpc-2', 'vpc-1'])
+            self.assertEqual([x.get_start_address() for x in snapshot.get_overlapping(IPv4Network('10.60.0.0/16'))],
+                             [IPv4Address('10.51.0.0')])
+
+        # Mapping of a truncated file is closed when the snapshot is rejected
+        with open(path, 'r+b') as fh:
+            fh.truncate(os.path.getsize(path) - 1)
+        mapped = []
+        mmap_class = mmap.mmap
+        with mock.patch('pyvpc.pyvpc_snapshot.mmap.mmap',
+                        side_effect=lambda *args, **kwargs: mapped.append(mmap_class(*args, **kwargs)) or mapped[-1]):
+            self.assertRaises(ValueError, load_pyvpc_snapshot, path)
+        self.assertTrue(mapped[0].closed)
+
+        unsorted = PyVPCSnapshot(dumps_pyvpc_objects(list(reversed(self.blocks))))
+        self.assertFalse(unsorted.is_sorted)
+        self.assertEqual([x.get_id() for x in unsorted.get_overlapping(IPv4Network('10.10.5.0/24'))],
+                         ['vpc-1', 'vpc-2'])
+
+
+class FakeEC2Client(object):
+    """
+    Minimal stand-in for a boto3 ec2 client, records every api call made,
+    if first_round is set (threading.Barrier), the first calls block until that many calls are in flight together,
+    and the round trip of each call (1 for those concurrent calls, 2 for any later call) is recorded in rounds
+    """
+    def __init__(self, vpcs, subnets):
+        self.vpcs = vpcs
+        self.subnets = subnets
+        self.calls = []
+        self.rounds = []
+        self.first_round = None
+        self.lock = threading.Lock()
+
+    def record_call(self, call):
+        with self.lock:
+            self.calls.append(call)
+            in_first_round = self.first_round is not None and len(self.calls) <= self.first_round.parties
+        if in_first_round:
+            # Raises BrokenBarrierError if the calls are not sent concurrently
+            self.first_round.wait()
+        with self.lock:
+            self.rounds.append(1 if in_first_round else 2)
+
+    @staticmethod
+    def filter_items(items, filters):
+        name = filters[0]['Name']
+        values = filters[0]['Values']
+        if name == 'tag:Name':
+            return [x for x in items for tag in x.get('Tags', []) if tag['Key'] == 'Name' and tag['Value'] in values]
+        return [x for x in items if x['VpcId'] in values]
+
+    def describe_vpcs(self, Filters):
+        self.record_call(('describe_vpcs', Filters[0]['Name']))
+        return {'Vpcs': self.filter_items(self.vpcs, Filters)}
+
+    def describe_subnets(self, Filters):
+        self.record_call(('describe_subnets', Filters[0]['Values'][0]))
+        return {'Subnets': self.filter_items(self.subnets, Filters)}
+
+    def get_paginator(self, operation_name):
+        # Return every item split over single item pages
+        items = self.vpcs if operation_name == 'describe_vpcs' else self.subnets
+        key = 'Vpcs' if operation_name == 'describe_vpcs' else 'Subnets'
+        paginator = mock.Mock()
+        paginator.paginate.return_value = [{key: [item]} for item in items]
+        self.calls.append((operation_name, None))
+        return paginator
+
+
+class AWSLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeEC2Client(
+            vpcs=[{'VpcId': 'vpc-1', 'CidrBlock': '10.50.0.0/16', 'Tags': [{'Key': 'Name', 'Value': 'arie-test-vpc'}]},
+                  {'VpcId': 'vpc-2', 'CidrBlock': '10.60.0.0/16', 'Tags': [{'Key': 'Name', 'Value': 'dup'}]},
+                  {'VpcId': 'vpc-3', 'CidrBlock': '10.70.0.0/16', 'Tags': [{'Key': 'Name', 'Value': 'dup'}],
+                   'CidrBlockAssociationSet': [
+                       {'CidrBlock': '10.70.0.0/16', 'CidrBlockState': {'State': 'associated'}},
+                       {'CidrBlock': '10.71.0.0/24', 'CidrBlockState': {'State': 'associated'}},
+                       {'CidrBlock': '10.72.0.0/24', 'CidrBlockState': {'State': 'disassociated'}}]}],
+            subnets=[{'VpcId': 'vpc-1', 'SubnetId': 'subnet-1', 'CidrBlock': '10.50.64.0/19'},
+                     {'VpcId': 'vpc-2', 'SubnetId': 'subnet-2', 'CidrBlock': '10.60.0.0/24'},
+                     {'VpcId': 'vpc-3', 'SubnetId': 'subnet-3', 'CidrBlock': '10.71.0.0/25'}])
+        patcher = mock.patch('pyvpc.pyvpc.boto3.client', return_value=self.client)
+        self.boto3_client = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_aws_vpc_and_subnets_by_id(self):
+        self.client.first_round = threading.Barrier(3, timeout=5)
+        vpc, subnets = get_aws_vpc_and_subnets('vpc-1', 'eu-west-1')
+
+        self.assertEqual(vpc.get_id(), 'vpc-1')
+        self.assertEqual(vpc.get_name(), 'arie-test-vpc')
+        self.assertEqual([x.get_id() for x in subnets], ['subnet-1'])
+        # vpc-id, tag:Name and subnets lookups are all in flight together, no follow up call
+        self.assertEqual(self.client.rounds, [1, 1, 1])
+        self.boto3_client.assert_called_once_with('ec2', region_name='eu-west-1')
+
+    def test_get_aws_vpc_and_subnets_by_name(self):
+        self.client.first_round = threading.Barrier(3, timeout=5)
+        vpc, subnets = get_aws_vpc_and_subnets('arie-test-vpc')
+
+        self.assertEqual(vpc.get_id(), 'vpc-1')
+        self.assertEqual([x.get_id() for x in subnets], ['subnet-1'])
+        # Speculative subnets fetch missed, so a single extra (sequential) describe_subnets call is made
+        self.assertEqual(self.client.rounds, [1, 1, 1, 2])
+        self.assertEqual(self.client.calls[-1], ('describe_subnets', 'vpc-1'))
+
+    def test_get_aws_vpc_if_exists(self):
+        self.assertEqual(get_aws_vpc_if_exists('vpc-2').get_network(), IPv4Network('10.60.0.0/16'))
+        self.assertEqual(len(self.client.calls), 2)
+
+        self.assertIsNone(get_aws_vpc_if_exists('missing'))
+        self.assertEqual(get_aws_vpc_and_subnets('missing'), (None, []))
+        self.assertRaises(ValueError, get_aws_vpc_if_exists, 'dup')
+
+    def test_get_aws_vpcs_and_subnets(self):
+        vpcs, subnets_by_vpc = get_aws_vpcs_and_subnets()
+
+        # vpc-3 has a secondary cidr associated
+        self.assertEqual([(x.get_id(), str(x.get_network())) for x in vpcs],
+                         [('vpc-1', '10.50.0.0/16'), ('vpc-2', '10.60.0.0/16'),
+                          ('vpc-3', '10.70.0.0/16'), ('vpc-3', '10.71.0.0/24')])
+        self.assertEqual(sorted(subnets_by_vpc), ['vpc-1', 'vpc-2', 'vpc-3'])
+        self.assertEqual(subnets_by_vpc['vpc-1'][0].get_network(), IPv4Network('10.50.64.0/19'))
+        # A single paginated pass for each of vpcs and subnets
+        self.assertEqual(len(self.client.calls), 2)
+
+    def test_calculate_vpcs_utilisation(self):
+        vpcs, subnets_by_vpc = get_aws_vpcs_and_subnets()
+        report = calculate_vpcs_utilisation(vpcs, subnets_by_vpc)
+
+        self.assertEqual(report[0]['id'], 'vpc-1')
+        self.assertEqual(report[0]['used_addresses'], 8192)
+        self.assertEqual(report[0]['available_addresses'], 65536 - 8192)
+        self.assertEqual(report[0]['utilisation'], 12.5)
+        self.assertEqual(report[2]['used_addresses'], 0)
+        self.assertEqual(report[2]['utilisation'], 0)
+        # Subnet in secondary cidr is counted as used
+        self.assertEqual(report[3]['cidr'], '10.71.0.0/24')
+        self.assertEqual(report[3]['used_addresses'], 128)
+        self.assertEqual(report[3]['utilisation'], 50)
+
+        # Process pool must return same report
+        self.assertEqual(calculate_vpcs_utilisation(vpcs, subnets_by_vpc, processes=2), report)
+
 
 if __name__ == '__main__':
     unittest.main()